@@ -10,6 +10,12 @@ class Attenuator(object):
         self.factors = list(attenuation_factors.values())
         self.attenuation_factors = attenuation_factors
 
+        # the interpolant over the factor table is built lazily once and interpolated factors
+        # are memoized per frequency, instead of rebuilding the interpolator on every lookup
+        self._interpolator = None
+        self._factor_cache = {}
+        self._matrix = None
+
     @classmethod
     def load_from_file(cls, filename):
         af = np.loadtxt(filename)
@@ -21,6 +27,44 @@ class Attenuator(object):
 
         return cls(attenuation_factors)
 
+    @property
+    def attenuation_matrix(self):
+        """
+        The frequency/factor table as a two column array, built once and shared (read-only)
+        between every stimulus using this attenuator.
+        """
+        if self._matrix is None:
+            matrix = np.column_stack((self.frequencies, self.factors))
+            matrix.flags.writeable = False
+            self._matrix = matrix
+        return self._matrix
+
+    def get_factor(self, frequency):
+        """
+        Get the scalar attenuation factor for a frequency. Frequencies not in the lookup table
+        are linearly interpolated between the pre-loaded values. A frequency of None means no
+        attenuation and returns 1.0.
+        """
+        if frequency is None:
+            return 1.0
+
+        # Lookup the attenuation factor, if we don't find it, then we need to linearly
+        # interpolate between the values to get the right factor.
+        try:
+            return self.attenuation_factors[frequency]
+        except KeyError:
+            pass
+
+        try:
+            return self._factor_cache[frequency]
+        except KeyError:
+            if self._interpolator is None:
+                self._interpolator = interp1d(list(self.attenuation_factors.keys()),
+                                              list(self.attenuation_factors.values()),
+                                              kind='linear')
+            factor = self._factor_cache[frequency] = float(self._interpolator(frequency))
+            return factor
+
     def attenuate(self, data, frequency):
 
         # Frequency determines the attenuation, if it is None, then just pass
@@ -29,19 +73,4 @@ class Attenuator(object):
         if frequency is None:
             return data
 
-        # Otherwise, we need attenuate the data based on the frequency and the pre-loaded
-        # attenuation factors.
-        else:
-
-            # Lookup the attenuation factor, if we find it, scale the data.
-            try:
-                attenuation_factor = self.attenuation_factors[frequency]
-            except:
-                # If we don't find it, then we need to linearly interpolate between the
-                # values to get the right factor.
-
-                interpolator = interp1d(list(self.attenuation_factors.keys()), list(self.attenuation_factors.values()),
-                                        kind='linear')
-                attenuation_factor = interpolator(frequency)
-
-        return data * attenuation_factor
+        return data * self.get_factor(frequency)
@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
 import os
+import mmap
 import queue
+import ctypes
 import logging
 import threading
 
+from collections import deque
+
 from typing import Optional
 
 
@@ -38,6 +42,8 @@ DAQ_SAMPLE_RATE_DEFAULT = 10000
 
 DAQ_NUM_OUTPUT_SAMPLES = 5000
 DAQ_NUM_OUTPUT_SAMPLES_PER_EVENT = 250
+# how many chunks the producer thread keeps prepared ahead of the DAQ callback
+DAQ_NUM_OUTPUT_CHUNKS_PREFILL = 2
 DAQ_NUM_INPUT_SAMPLES = 10000
 DAQ_NUM_INPUT_SAMPLES_PER_EVENT = 10000
 
@@ -53,6 +59,28 @@ INPUT_SYNCHRONIZATION_INFO_FIELDS = ('fictrac_frame_num',
 INPUT_SYNCHRONIZATION_INFO_NUM_FIELDS = len(INPUT_SYNCHRONIZATION_INFO_FIELDS)
 
 
+def _page_locked_zeros(shape, dtype):
+    """
+    Allocate a zeroed array backed by page-aligned, page-locked (pinned) memory so the DAQmx
+    driver can DMA from/to it without an internal bounce copy. Locking needs RLIMIT_MEMLOCK
+    (or SeLockMemoryPrivilege on Windows) so this falls back to a plain np.zeros on failure.
+    """
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    try:
+        if hasattr(mmap, 'MAP_LOCKED'):
+            mm = mmap.mmap(-1, nbytes, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS | mmap.MAP_LOCKED)
+        else:
+            mm = mmap.mmap(-1, nbytes)
+            addr = ctypes.addressof(ctypes.c_char.from_buffer(mm))
+            if not ctypes.windll.kernel32.VirtualLock(ctypes.c_void_p(addr), ctypes.c_size_t(nbytes)):
+                raise OSError('VirtualLock failed')
+        # anonymous mappings are zero-filled; the array keeps the mmap alive via its base
+        return np.frombuffer(mm, dtype=dtype).reshape(shape)
+    except (OSError, ValueError, AttributeError):
+        return np.zeros(shape, dtype=dtype)
+
+
 # noinspection PyPep8Naming
 class IOTask(daq.Task):
     """
@@ -96,10 +124,20 @@ class IOTask(daq.Task):
         # These are just some dummy values for pass by reference C functions that the NI DAQ api has.
         self.read = daq.int32()
         self.read_float64 = daq.float64()
+        # constructed once - building a new byref per DAQ interrupt is wasted interpreter time
+        self._read_byref = daq.byref(self.read)
 
         self.limits = limits
 
         self.cha_type = cha_type
+        # resolved once so the per-interrupt callback dispatches on a bool and not a string compare
+        self._is_input = cha_type == "input"
+        self._is_output = cha_type == "output"
+
+        # bind the direction-specialized callback implementation up front (PyDAQmx resolves
+        # self.EveryNCallback when the every-N event is registered, below) so each interrupt
+        # enters the right code path with no dispatch at all
+        self.EveryNCallback = self._every_n_input if self._is_input else self._every_n_output
         _full_cha_ids = ['%s/%s' % (dev_name, ch) for ch in cha_ids]  # append device name
         self.cha_string = ", ".join(_full_cha_ids)
 
@@ -114,12 +152,25 @@ class IOTask(daq.Task):
         self._signal_producer = None
 
         self._data_generator = None
+        # single-producer/single-consumer handoff of replacement generators. deque append/popleft
+        # are atomic under the GIL so neither the caller nor the DAQ callback ever takes a lock
+        # (and the callback can never stall on a mutex held across a GC pause). maxlen=1 because
+        # only the newest requested generator matters.
+        self._pending_data_generators = deque(maxlen=1)
         self._data_recorders = None
 
+        # output chunks are prepared ahead of the DAQ callback by a producer thread (output
+        # tasks with a callback only) so generating the next buffer overlaps the DAQ write
+        self._full_q = None
+        self._producer_thread = None
+        self._producer_stop = threading.Event()
+        self._priming = False
+        self.num_underruns = 0
+
         self._silence_chunk = None  # type: Optional[SampleChunk]
         self._last_chunk = None  # type: Optional[SampleChunk]
 
-        if self.cha_type is "input":
+        if self._is_input:
             if not self.digital:
                 if use_RSE:
                     self.CreateAIVoltageChan(self.cha_string, "", DAQmx_Val_RSE, -limits, limits, DAQmx_Val_Volts, None)
@@ -138,7 +189,7 @@ class IOTask(daq.Task):
                 self.AutoRegisterEveryNSamplesEvent(DAQmx_Val_Acquired_Into_Buffer, self.num_samples_per_event, 0)
                 self.CfgInputBuffer(self.num_samples_per_chan * self.num_channels * 4)
 
-        elif self.cha_type is "output":
+        elif self._is_output:
             if not self.digital:
                 self.CreateAOVoltageChan(self.cha_string, "", -limits, limits, DAQmx_Val_Volts, None)
             else:
@@ -245,19 +296,23 @@ class IOTask(daq.Task):
                                                H5_SYNC_VERSION,
                                                attribute_name='__version')
 
-        if not digital:
-            self._data = np.zeros((self.num_samples_per_chan, self.num_channels),
-                                  dtype=np.float64)  # init empty data array
-        else:
-            self._data = np.zeros((self.num_samples_per_chan, self.num_channels), dtype=np.uint8)
+        # init empty data array (pinned where possible so DAQmx can DMA without a bounce copy)
+        self._data = _page_locked_zeros((self.num_samples_per_chan, self.num_channels),
+                                        np.float64 if not digital else np.uint8)
+
+        # cache the bound read/write method used by the callback so each interrupt does a single
+        # indirect call rather than re-resolving the PyDAQmx wrapper by attribute lookup
+        if self._is_input:
+            self._do_read = self.ReadDigitalLines if digital else self.ReadAnalogF64
+        elif self._is_output:
+            self._do_write = self.WriteDigitalLines if digital else self.WriteAnalogF64
 
         self.CfgSampClkTiming(clock_source, rate, DAQmx_Val_Rising, DAQmx_Val_ContSamps, self.num_samples_per_chan)
         self.AutoRegisterDoneEvent(0)
 
         if has_callback:
-            self._data_lock = threading.Lock()
             self._newdata_event = threading.Event()
-            if self.cha_type is "output":
+            if self._is_output:
 
                 cbf = rate / float(self.num_samples_per_event)
                 self._log.info('buffer size: %d (buffer callback called every %.3fs, at %.1fHz)' % (
@@ -273,12 +328,30 @@ class IOTask(daq.Task):
                 self.SetWriteRegenMode(DAQmx_Val_DoNotAllowRegen)
                 self.CfgOutputBuffer(self.num_samples_per_chan * self.num_channels * 2)
 
-                self.EveryNCallback()  # fill buffer on init
+                self._full_q = queue.Queue(maxsize=DAQ_NUM_OUTPUT_CHUNKS_PREFILL)
+                self._producer_thread = threading.Thread(target=self._produce_chunks_main,
+                                                         daemon=True, name='IOTaskChunkProducer')
+                self._producer_thread.start()
+
+                # fill buffer on init. the producer thread may not have queued its first
+                # chunk yet, so this one call waits for it (init is not on the real-time
+                # path) instead of counting a spurious underrun
+                self._priming = True
+                self.EveryNCallback()
+                self._priming = False
         else:
             self.SetWriteRegenMode(DAQmx_Val_AllowRegen)
             self.CfgOutputBuffer(self.num_samples_per_chan * self.num_channels * 2)
 
     def stop(self):
+        if self._producer_thread is not None:
+            self._producer_stop.set()
+            self._producer_thread.join(timeout=1.0)
+
+        if self.num_underruns:
+            self._log.warning('output underruns: %d callback(s) played silence because no '
+                              'chunk was ready' % self.num_underruns)
+
         if self._data_generator is not None:
             self._data = self._data_generator.close()
 
@@ -293,9 +366,9 @@ class IOTask(daq.Task):
                 data_generator = self._signal_producer.play_item(item)
                 self._log.info('playing playlist item identifier: %s' % item)
 
-                with self._data_lock:
-                    chunked_gen = chunker(data_generator, chunk_size=self.num_samples_per_event)
-                    self._data_generator = chunked_gen
+                chunked_gen = chunker(data_generator, chunk_size=self.num_samples_per_event,
+                                      n_buffers=DAQ_NUM_OUTPUT_CHUNKS_PREFILL + 2)
+                self._pending_data_generators.append(chunked_gen)
 
             except ValueError as _exc:
                 self._log.warning('error playing playlist item: %s' % _exc)
@@ -311,9 +384,9 @@ class IOTask(daq.Task):
         self._log.info('playing AudioStim object: %r' % stim)
 
         data_generator = stim.data_generator()
-        with self._data_lock:
-            chunked_gen = chunker(data_generator, chunk_size=self.num_samples_per_event)
-            self._data_generator = chunked_gen
+        chunked_gen = chunker(data_generator, chunk_size=self.num_samples_per_event,
+                              n_buffers=DAQ_NUM_OUTPUT_CHUNKS_PREFILL + 2)
+        self._pending_data_generators.append(chunked_gen)
 
     @property
     def data_recorders(self):
@@ -343,107 +416,157 @@ class IOTask(daq.Task):
             self.WriteAnalogF64(data.shape[0], 0, DAQmx_Val_WaitInfinitely, DAQmx_Val_GroupByChannel, data,
                                 daq.byref(self.read), None)
 
-    def EveryNCallback(self):
-        with self._data_lock:
-            tns = None
+    def _every_n_input(self):
+        tns = self.flyvr_shared_state.TIME_NS
+        if not self.digital:
+            self._do_read(DAQmx_Val_Auto, 1.0, DAQmx_Val_GroupByScanNumber,
+                          self._data, self.num_samples_per_chan * self.num_channels, self._read_byref,
+                          None)
+        else:
+            numBytesPerSamp = daq.int32()
+            self._do_read(self.num_samples_per_chan, 1.0, DAQmx_Val_GroupByScanNumber,
+                          self._data, self.num_samples_per_chan * self.num_channels,
+                          self._read_byref, byref(numBytesPerSamp), None)
 
-            if self.cha_type is "input":
-                tns = self.flyvr_shared_state.TIME_NS
-                if not self.digital:
-                    self.ReadAnalogF64(DAQmx_Val_Auto, 1.0, DAQmx_Val_GroupByScanNumber,
-                                       self._data, self.num_samples_per_chan * self.num_channels, daq.byref(self.read),
-                                       None)
-                else:
-                    numBytesPerSamp = daq.int32()
-                    self.ReadDigitalLines(self.num_samples_per_chan, 1.0, DAQmx_Val_GroupByScanNumber,
-                                          self._data, self.num_samples_per_chan * self.num_channels,
-                                          byref(self.read), byref(numBytesPerSamp), None)
-
-                # latch the current timing info as close to the read call completion as possible
-                self.flyvr_shared_state.DAQ_INPUT_NUM_SAMPLES_READ += self._data.shape[0]
-                row = [self.flyvr_shared_state.FICTRAC_FRAME_NUM,
-                       self.flyvr_shared_state.DAQ_OUTPUT_NUM_SAMPLES_WRITTEN,
-                       self.flyvr_shared_state.DAQ_INPUT_NUM_SAMPLES_READ,
-                       self.flyvr_shared_state.SOUND_OUTPUT_NUM_SAMPLES_WRITTEN,
-                       self.flyvr_shared_state.VIDEO_OUTPUT_NUM_FRAMES,
-                       tns]
-
-                # save the data
-                self.flyvr_shared_state.logger.log(self.samples_dset_name, self._data)
-
-                # save the sync info
-                self.flyvr_shared_state.logger.log(self.samples_sync_dset_name,
-                                                   np.array(row, dtype=np.int64))
+        # latch the current timing info as close to the read call completion as possible
+        self.flyvr_shared_state.DAQ_INPUT_NUM_SAMPLES_READ += self._data.shape[0]
+        row = [self.flyvr_shared_state.FICTRAC_FRAME_NUM,
+               self.flyvr_shared_state.DAQ_OUTPUT_NUM_SAMPLES_WRITTEN,
+               self.flyvr_shared_state.DAQ_INPUT_NUM_SAMPLES_READ,
+               self.flyvr_shared_state.SOUND_OUTPUT_NUM_SAMPLES_WRITTEN,
+               self.flyvr_shared_state.VIDEO_OUTPUT_NUM_FRAMES,
+               tns]
 
-            elif self.cha_type is "output":
+        # save the data
+        self.flyvr_shared_state.logger.log(self.samples_dset_name, self._data)
 
-                if self._data_generator is None:
-                    chunk = self._silence_chunk
-                else:
-                    chunk = next(self._data_generator)  # type: SampleChunk
-                    if chunk is None:
-                        chunk = self._silence_chunk
-
-                self._data = chunk.data
-                assert (len(self._data) == self.num_samples_per_event)
-
-                if not self.digital:
-                    tns = self.flyvr_shared_state.TIME_NS
-                    self.WriteAnalogF64(self._data.shape[0], 0, DAQmx_Val_WaitInfinitely, DAQmx_Val_GroupByScanNumber,
-                                        self._data, daq.byref(self.read), None)
-
-                    # same order as SampleChunk.SYNCHRONIZATION_INFO_FIELDS
-                    row = [self.flyvr_shared_state.FICTRAC_FRAME_NUM,
-                           self.flyvr_shared_state.DAQ_OUTPUT_NUM_SAMPLES_WRITTEN,
-                           self.flyvr_shared_state.DAQ_INPUT_NUM_SAMPLES_READ,
-                           self.flyvr_shared_state.SOUND_OUTPUT_NUM_SAMPLES_WRITTEN,
-                           self.flyvr_shared_state.VIDEO_OUTPUT_NUM_FRAMES,
-                           tns,
-                           chunk.producer_instance_n,
-                           chunk.chunk_n,
-                           chunk.producer_playlist_n,
-                           chunk.mixed_producer,
-                           chunk.mixed_start_offset]
-
-                    self.flyvr_shared_state.logger.log("/daq/chunk_synchronization_info",
-                                                       np.array(row, dtype=np.int64))
-
-                    # noinspection DuplicatedCode
-                    if chunk_producers_differ(self._last_chunk, chunk):
-                        self._log.debug('chunk from new producer: %r' % chunk)
-                        self.flyvr_shared_state.signal_new_playlist_item(chunk.producer_identifier, BACKEND_DAQ,
-                                                                         chunk_producer_instance_n=chunk.producer_instance_n,
-                                                                         chunk_n=chunk.chunk_n,
-                                                                         chunk_producer_playlist_n=chunk.producer_playlist_n,
-                                                                         chunk_mixed_producer=chunk.mixed_producer,
-                                                                         chunk_mixed_start_offset=chunk.mixed_start_offset,
-                                                                         # ensure identical values to the h5 row
-                                                                         fictrac_frame_num=row[0],
-                                                                         daq_output_num_samples_written=row[1],
-                                                                         daq_input_num_samples_read=row[2],
-                                                                         sound_output_num_samples_written=row[3],
-                                                                         video_output_num_frames=row[4],
-                                                                         # and a time for replay experiments
-                                                                         time_ns=row[5])
-
-                    self.flyvr_shared_state.DAQ_OUTPUT_NUM_SAMPLES_WRITTEN += self._data.shape[0]
-                    self._last_chunk = chunk
+        # save the sync info
+        self.flyvr_shared_state.logger.log(self.samples_sync_dset_name,
+                                           np.array(row, dtype=np.int64))
 
-                else:
-                    tns = self.flyvr_shared_state.TIME_NS
-                    self.WriteDigitalLines(self._data.shape[0], False, DAQmx_Val_WaitInfinitely,
-                                           DAQmx_Val_GroupByScanNumber, self._data, None, None)
+        self._notify_data_recorders(tns)
 
-            # send the data to a control if requested.
-            if self.data_recorders is not None:
-                for data_rec in self.data_recorders:
-                    if self._data is not None:
-                        data_rec.send((self._data, tns))
+        return 0  # The function should return an integer
 
-            self._newdata_event.set()
+    def _every_n_output(self):
+
+        # the producer thread prepares chunks ahead of us; never block the callback waiting
+        # for one - play silence and count the underrun instead. the sole exception is the
+        # priming call from __init__, which may legitimately beat the producer to its first
+        # chunk and so blocks briefly rather than underrunning
+        try:
+            if self._priming:
+                chunk = self._full_q.get(timeout=1.0)  # type: SampleChunk
+            else:
+                chunk = self._full_q.get_nowait()  # type: SampleChunk
+        except queue.Empty:
+            chunk = self._silence_chunk
+            if not self._priming:
+                self.num_underruns += 1
+
+        self._data = chunk.data
+        assert (len(self._data) == self.num_samples_per_event)
+
+        if not self.digital:
+            tns = self.flyvr_shared_state.TIME_NS
+            self._do_write(self._data.shape[0], 0, DAQmx_Val_WaitInfinitely, DAQmx_Val_GroupByScanNumber,
+                           self._data, self._read_byref, None)
+
+            # same order as SampleChunk.SYNCHRONIZATION_INFO_FIELDS
+            row = [self.flyvr_shared_state.FICTRAC_FRAME_NUM,
+                   self.flyvr_shared_state.DAQ_OUTPUT_NUM_SAMPLES_WRITTEN,
+                   self.flyvr_shared_state.DAQ_INPUT_NUM_SAMPLES_READ,
+                   self.flyvr_shared_state.SOUND_OUTPUT_NUM_SAMPLES_WRITTEN,
+                   self.flyvr_shared_state.VIDEO_OUTPUT_NUM_FRAMES,
+                   tns,
+                   chunk.producer_instance_n,
+                   chunk.chunk_n,
+                   chunk.producer_playlist_n,
+                   chunk.mixed_producer,
+                   chunk.mixed_start_offset]
+
+            self.flyvr_shared_state.logger.log("/daq/chunk_synchronization_info",
+                                               np.array(row, dtype=np.int64))
+
+            # noinspection DuplicatedCode
+            if chunk_producers_differ(self._last_chunk, chunk):
+                self._log.debug('chunk from new producer: %r' % chunk)
+                self.flyvr_shared_state.signal_new_playlist_item(chunk.producer_identifier, BACKEND_DAQ,
+                                                                 chunk_producer_instance_n=chunk.producer_instance_n,
+                                                                 chunk_n=chunk.chunk_n,
+                                                                 chunk_producer_playlist_n=chunk.producer_playlist_n,
+                                                                 chunk_mixed_producer=chunk.mixed_producer,
+                                                                 chunk_mixed_start_offset=chunk.mixed_start_offset,
+                                                                 # ensure identical values to the h5 row
+                                                                 fictrac_frame_num=row[0],
+                                                                 daq_output_num_samples_written=row[1],
+                                                                 daq_input_num_samples_read=row[2],
+                                                                 sound_output_num_samples_written=row[3],
+                                                                 video_output_num_frames=row[4],
+                                                                 # and a time for replay experiments
+                                                                 time_ns=row[5])
+
+            self.flyvr_shared_state.DAQ_OUTPUT_NUM_SAMPLES_WRITTEN += self._data.shape[0]
+            self._last_chunk = chunk
+
+        else:
+            tns = self.flyvr_shared_state.TIME_NS
+            self._do_write(self._data.shape[0], False, DAQmx_Val_WaitInfinitely,
+                           DAQmx_Val_GroupByScanNumber, self._data, None, None)
+
+        self._notify_data_recorders(tns)
 
         return 0  # The function should return an integer
 
+    def _notify_data_recorders(self, tns):
+        # send the data to a control if requested.
+        if self.data_recorders is not None:
+            for data_rec in self.data_recorders:
+                if self._data is not None:
+                    data_rec.send((self._data, tns))
+
+        self._newdata_event.set()
+
+    def _produce_chunks_main(self):
+        """
+        Producer thread main for output tasks. Runs the data generator one (or more) chunks ahead
+        of the DAQ callback so generating the next buffer overlaps the DAQmx write, and picks up
+        requested generator swaps between fills.
+        """
+        while not self._producer_stop.is_set():
+
+            try:
+                self._data_generator = self._pending_data_generators.popleft()
+                # drop chunks prepared from the previous generator so the swap is heard promptly
+                while True:
+                    try:
+                        self._full_q.get_nowait()
+                    except queue.Empty:
+                        break
+            except IndexError:
+                pass
+
+            chunk = None
+            if self._data_generator is not None:
+                try:
+                    chunk = next(self._data_generator)  # type: SampleChunk
+                except Exception:
+                    # a dead generator must not kill the producer thread silently - log it,
+                    # flag the runtime error and degrade to silence like a paused playlist
+                    self._log.exception('error generating output chunk - playing silence')
+                    self.flyvr_shared_state.runtime_error(1)
+                    self._data_generator = None
+
+            if chunk is None:
+                chunk = self._silence_chunk
+
+            while not self._producer_stop.is_set():
+                try:
+                    self._full_q.put(chunk, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
     # noinspection PyUnusedLocal
     def DoneCallback(self, status):
 
@@ -523,7 +646,7 @@ def io_task_loop(msg_queue: queue.Queue, flyvr_shared_state, options):
                             num_samples_per_event=DAQ_NUM_INPUT_SAMPLES_PER_EVENT,
                             shared_state=flyvr_shared_state, use_RSE=options.use_RSE)
 
-            disp_task = ConcurrentTask(task=plot_task_daq, comms="pipe",
+            disp_task = ConcurrentTask(task=plot_task_daq, comms="shmem",
                                        taskinitargs=[input_chan_names, taskAI.num_samples_per_chan, 5])
 
             # Setup the display task to receive messages from recording task.
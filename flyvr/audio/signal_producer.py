@@ -5,6 +5,11 @@ from typing import Optional, Callable, Iterator
 
 import numpy as np
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
 
 class SampleChunk(object):
     """
@@ -71,6 +76,27 @@ def chunk_producers_differ(prev: Optional[SampleChunk], this: Optional[SampleChu
         return prev == this
 
 
+def _fill_chunk(next_chunk, data, w_idx, r_idx):
+    """
+    Copy as many samples as will fit from data[r_idx:] into next_chunk[w_idx:] and return the
+    updated write and read indices. This is the hot inner copy of chunker and is compiled with
+    numba when available (nogil, so the copy does not hold the GIL while a DAQ callback runs).
+    """
+    sz = min(next_chunk.shape[0] - w_idx, data.shape[0] - r_idx)
+    next_chunk[w_idx:w_idx + sz] = data[r_idx:r_idx + sz]
+    return w_idx + sz, r_idx + sz
+
+
+if numba is not None:
+    _fill_chunk = numba.njit(cache=True, nogil=True)(_fill_chunk)
+
+    # pre-warm the common float64 specializations so the first DAQ callback does not pay
+    # the compile latency. _fill_chunk stays lazily specialized (no pinned signatures)
+    # because the chunker is dtype-generic.
+    _fill_chunk(np.zeros(1), np.zeros(1), 0, 0)
+    _fill_chunk(np.zeros((1, 1)), np.zeros((1, 1)), 0, 0)
+
+
 CallbackFunction = Callable[[SampleChunk], None]
 
 
@@ -86,6 +112,12 @@ class SignalProducer(object, metaclass=abc.ABCMeta):
 
     SUPPORTED_DTYPES = np.float64,
 
+    # producers are created per-playlist-item and accessed heavily from the generator hot
+    # paths; slots drop the per-instance dict and make attribute access an offset load.
+    # Sub-classes declare their own additional slots (or omit them to regain a __dict__).
+    __slots__ = ('backend', 'producer_instance_n', 'type', 'identifier', 'dtype',
+                 '_next_event_callbacks', '__weakref__')
+
     def __init__(self, type_, instance_identifier,
                  next_event_callback: Optional[CallbackFunction] = None):
 
@@ -144,7 +176,7 @@ class SignalProducer(object, metaclass=abc.ABCMeta):
         return data.shape[0]
 
 
-def chunker(gen, chunk_size=100) -> Iterator[Optional[SampleChunk]]:
+def chunker(gen, chunk_size=100, n_buffers=2) -> Iterator[Optional[SampleChunk]]:
     """
     A function that takes a generator function that outputs arbitrary size SampleChunk objects. These object contain
     a numpy array of arbitrary size. This function can take SampleChunk objects and turn them into fix sized object or
@@ -153,8 +185,16 @@ def chunker(gen, chunk_size=100) -> Iterator[Optional[SampleChunk]]:
 
     :param gen: A generator function that returns SampleChunk objects.
     :param chunk_size: The number of elements along the first dimension to include in each chunk.
+    :param n_buffers: The number of preallocated output buffers to cycle through. A yielded chunk
+        stays valid until n_buffers - 1 further chunks have been produced, so consumers that queue
+        chunks ahead (the DAQ producer thread) pass a correspondingly larger value.
     :return: A generator function that returns chunks.
     """
+    # Preallocated output buffers used in rotation (ping-pong for the default of two). All
+    # consumers copy the data out (DAQ driver memory, MixedSignal._data, etc) before the
+    # buffer comes around again.
+    out_bufs = None
+    out_buf_n = 0
     next_chunk = None
     curr_data_sample = 0
     curr_chunk_sample = 0
@@ -179,26 +219,21 @@ def chunker(gen, chunk_size=100) -> Iterator[Optional[SampleChunk]]:
             num_samples = data.shape[0]
 
             # If this is our first chunk, use its dimensions to figure out the number of columns
-            if next_chunk is None:
+            if out_bufs is None:
                 chunk_shape = list(data.shape)
                 chunk_shape[0] = chunk_size
-                next_chunk = np.zeros(tuple(chunk_shape), dtype=data.dtype)
+                out_bufs = [np.empty(tuple(chunk_shape), dtype=data.dtype) for _ in range(n_buffers)]
+                next_chunk = out_bufs[out_buf_n]
 
         # We want to add at most chunk_size samples to a chunk. We need to see if the current data will fit. If it does,
-        # copy the whole thing. If it doesn't, just copy what will fit.
-        sz = min(chunk_size - curr_chunk_sample, num_samples - curr_data_sample)
-        if data.ndim == 1:
-            next_chunk[curr_chunk_sample:(curr_chunk_sample + sz)] = data[curr_data_sample:(curr_data_sample + sz)]
-        else:
-            next_chunk[curr_chunk_sample:(curr_chunk_sample + sz), :] = data[curr_data_sample:(curr_data_sample + sz), :]
-
-        curr_chunk_sample = curr_chunk_sample + sz
-        curr_data_sample = curr_data_sample + sz
+        # copy the whole thing. If it doesn't, just copy what will fit. The slice shapes always agree along trailing
+        # dimensions so a single assignment handles both 1-D and 2-D data.
+        curr_chunk_sample, curr_data_sample = _fill_chunk(next_chunk, data, curr_chunk_sample, curr_data_sample)
 
         if curr_chunk_sample == chunk_size:
             # noinspection PyUnboundLocalVariable
             sample_chunk_obj = copy.copy(sample_chunk_obj)  # type: SampleChunk
-            sample_chunk_obj.data = next_chunk.copy()
+            sample_chunk_obj.data = next_chunk
 
             chunk_mixed_start_offset = chunk_size - curr_data_sample
 
@@ -215,6 +250,9 @@ def chunker(gen, chunk_size=100) -> Iterator[Optional[SampleChunk]]:
             chunk_n += 1
             chunk_mixed = False
             curr_chunk_sample = 0
+            # rotate to the next output buffer so the chunk just yielded is not overwritten
+            out_buf_n = (out_buf_n + 1) % n_buffers
+            next_chunk = out_bufs[out_buf_n]
         else:
             # this chunk was not filled by the input stim/chunk, so taken another bite out of the next one
             # by looping again
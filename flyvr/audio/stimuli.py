@@ -1,6 +1,8 @@
 import re
 import abc
+import math
 import uuid
+import functools
 import os.path
 import logging
 import itertools
@@ -16,6 +18,99 @@ from scipy import signal
 from flyvr.audio.signal_producer import SignalProducer, SampleChunk, MixedSignal
 from flyvr.common import Randomizer
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+if numba is not None:
+    # explicit signatures so the kernels compile (from the on-disk cache after the first run)
+    # at import time rather than on the first stimulus construction.
+    # NB: these kernels must stay serial (no parallel=True/prange): numba's parallel threading
+    # runtime is fork-unsafe, and any process that compiles a parallel kernel and then forks
+    # (every ConcurrentTask/Manager on POSIX) deadlocks at interpreter shutdown. With pinned
+    # signatures the compile happens in every process that imports this module, which would
+    # make a parallel runtime start unconditionally. The fills are memory-bound so the serial
+    # loops cost essentially nothing.
+    @numba.njit('void(float64[::1], float64, float64, float64, float64)',
+                fastmath=True, cache=True, nogil=True)
+    def _fill_sin(out, amplitude, w, phase, step):
+        """fill out with amplitude * sin(w*t + phase) sampled at t = i*step"""
+        for i in range(out.shape[0]):
+            out[i] = amplitude * math.sin(w * (i * step) + phase)
+
+    # core may be one of the read-only memoized tables, so its array type is declared readonly
+    # (writable arrays cast to it fine)
+    _readonly_f64_c = numba.types.Array(numba.float64, 1, 'C', readonly=True)
+
+    @numba.njit(numba.types.UniTuple(numba.float64, 2)(numba.float64[::1], _readonly_f64_c,
+                                                       numba.float64, numba.int64),
+                fastmath=True, cache=True, nogil=True)
+    def _assemble(out, core, scale, n_pre):
+        """
+        fused stimulus assembly: zero-fill the pre/post silence regions of out, write the
+        scaled signal between them and track its min/max, all in one pass over the buffer
+        """
+        n = core.shape[0]
+        for i in range(n_pre):
+            out[i] = 0.0
+        for i in range(n_pre + n, out.shape[0]):
+            out[i] = 0.0
+
+        lo = core[0] * scale if n else 0.0
+        hi = lo
+        for i in range(n):
+            v = core[i] * scale
+            out[n_pre + i] = v
+            lo = min(lo, v)
+            hi = max(hi, v)
+        return lo, hi
+else:
+    def _fill_sin(out, amplitude, w, phase, step):
+        t = np.arange(out.shape[0]) * step
+        np.multiply(np.sin(w * t + phase), amplitude, out=out)
+
+    def _assemble(out, core, scale, n_pre):
+        n = core.shape[0]
+        out[:n_pre] = 0.0
+        out[n_pre + n:] = 0.0
+        seg = out[n_pre:n_pre + n]
+        np.multiply(core, scale, out=seg)
+        if n:
+            return seg.min(), seg.max()
+        return 0.0, 0.0
+
+
+def _silence_samples(silence_duration, sample_rate):
+    """
+    Sample count for a silence duration in milliseconds, as ceiling division (equivalent to
+    ceil(ms / 1000 * rate) without the ufunc dispatch np.ceil costs). Only the result is
+    coerced to int so fractional-millisecond durations keep their full sample count.
+    """
+    return int((silence_duration * sample_rate + 999) // 1000)
+
+
+@functools.lru_cache(maxsize=32)
+def _sin_table(frequency, amplitude, phase, sample_rate, duration):
+    """
+    Memoized sine synthesis. Experiments cycle stimuli through a small set of parameter
+    combinations, so regenerating an identical table is pure repeated work. The returned array
+    is marked read-only since it is shared between callers; the data setter copies it into the
+    freshly-assembled output buffer.
+    """
+    num_samples = int((float(sample_rate) / 1000.0) * duration)
+
+    # Generate the samples of the sin wave with specified amplitude, frequency, and phase.
+    # Sample times span [0, duration] inclusive (the same grid np.linspace produced here
+    # historically). Synthesis goes through _fill_sin, which is a serial nogil numba kernel
+    # when numba is installed (serial by necessity - see the note at the kernel definitions).
+    data = np.empty(num_samples)
+    step = (float(duration) / 1000.0) / (num_samples - 1) if num_samples > 1 else 0.0
+    _fill_sin(data, amplitude, 2.0 * np.pi * frequency, phase, step)
+    data.flags.writeable = False
+    return data
+
 
 class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
     """
@@ -28,6 +123,10 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
 
     NAME = None
 
+    __slots__ = ('_sample_rate', '_duration', '_pre_silence', '_post_silence', '_attenuator',
+                 '_frequency', '_intensity', '_max_value', '_min_value', '_data',
+                 'num_samples_generated', 'attenuation')
+
     def __init__(self, sample_rate, duration, intensity=1.0, pre_silence=0, post_silence=0, attenuator=None,
                  frequency=None, max_value=10.0, min_value=-10.0, next_event_callback=None, identifier=None):
         """
@@ -47,43 +146,63 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
                                                                                       uuid.uuid4().hex)),
                                         next_event_callback=next_event_callback)
 
-        self.__sample_rate = sample_rate
-        self.__duration = duration
-        self.__pre_silence = pre_silence
-        self.__post_silence = post_silence
-        self.__attenuator = attenuator
-        self.__frequency = frequency
-        self.__intensity = intensity
-        self.__max_value = max_value
-        self.__min_value = min_value
+        self._sample_rate = sample_rate
+        self._duration = duration
+        self._pre_silence = pre_silence
+        self._post_silence = post_silence
+        self._attenuator = attenuator
+        self._frequency = frequency
+        self._intensity = intensity
+        self._max_value = max_value
+        self._min_value = min_value
 
         # How many samples have been generated by calls to data_generator() iterators
         self.num_samples_generated = 0
 
-        self.attenuation = np.column_stack((attenuator.frequencies,
-                                            attenuator.factors)) if attenuator is not None else None
+        self._update_attenuation_metadata()
 
-        self.__data = []
+        self._data = []
 
-    def _gen_silence(self, silence_duration):
+    def configure(self, **params):
         """
-        Little helper function to generate silence data.
+        Set several stimulus parameters in one call, running the data pipeline (attenuation,
+        silence padding, intensity scaling and limit checks) exactly once at the end instead of
+        once per property assignment. The individual property setters delegate here.
 
-        :param int silence_duration: Amount of silence to generate in milliseconds.
-        :return: The silence signal.
-        :rtype: numpy.ndarray
+        :param params: Parameter names and values as accepted by the corresponding properties,
+            including sub-class parameters (e.g. amplitude for SinStim).
         """
-        return np.zeros(int(np.ceil((silence_duration / 1000.0) * self.sample_rate)))
+        changed = False
+        for name, value in params.items():
+            if self._set_param(name, value):
+                changed = True
+                if name == 'attenuator':
+                    self._update_attenuation_metadata()
+        if changed:
+            self.data = self._generate_data()
 
-    def _add_silence(self, data):
+    def _set_param(self, name, value):
+        """
+        Assign a stimulus parameter to its private attribute without regenerating the data and
+        return whether the value actually changed (no-op assignments skip regeneration).
         """
-        A helper function to add pre and post silence to a generated signal.
+        private = '_' + name
+        try:
+            old = getattr(self, private)
+        except AttributeError:
+            raise AttributeError("%s has no stimulus parameter '%s'" % (self.__class__.__name__, name))
+        if old is value or old == value:
+            return False
+        setattr(self, private, value)
+        return True
 
-        :param numpy.ndarray data: The data to add silence to.
-        :return: The data with silence added to its start and end.
-        :rtype: numpy.ndarray
+    def _update_attenuation_metadata(self):
+        """
+        Refresh the attenuation lookup matrix recorded alongside the stimulus. Previously this
+        was only built in __init__, so reassigning the attenuator left it stale.
         """
-        return np.concatenate([self._gen_silence(self.pre_silence), data, self._gen_silence(self.post_silence)])
+        attenuator = self._attenuator
+        self.attenuation = attenuator.attenuation_matrix if attenuator is not None else None
 
     @abc.abstractmethod
     def _generate_data(self):
@@ -105,7 +224,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
         :return: A 1D numpy.ndarray of data that can be passed directly to the DAQ.
         :rtype: numpy.ndarray
         """
-        return self.__data
+        return self._data
 
     @data.setter
     def data(self, data):
@@ -116,50 +235,68 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
         :param numpy.ndarray data: The raw audio signal data representing this stimulus.
         """
 
-        # If the user provided an attenuator, attenuate the signal
-        if self.__attenuator is not None:
-            data = self.__attenuator.attenuate(data, self.__frequency)
+        # Fold the attenuation factor and the intensity into one scalar gain, then assemble
+        # the padded output (silence zero-fill, scaling and min/max bounds) in a single fused
+        # pass instead of separate attenuate/pad/multiply/reduce traversals.
+        scale = self._intensity
+        if self._attenuator is not None:
+            scale = scale * self._attenuator.get_factor(self._frequency)
 
-        data = self._add_silence(data)
+        n_pre = _silence_samples(self.pre_silence, self._sample_rate)
+        n_post = _silence_samples(self.post_silence, self._sample_rate)
 
-        # Multiply the signal by the intensity factor
-        data = data * self.__intensity
+        core = np.ascontiguousarray(data, dtype=np.float64)
+        out = np.empty(n_pre + core.shape[0] + n_post)
+        lo, hi = _assemble(out, core, scale, n_pre)
+        if n_pre or n_post:
+            # the silence samples participate in the limit check too
+            lo = min(lo, 0.0)
+            hi = max(hi, 0.0)
 
-        self.__data = data
+        self._data = out
 
         # Perform limit check on data, make sure we are not exceeding
-        if data.max() > self.__max_value:
+        if hi > self._max_value:
             raise ValueError("Audio stimulus value exceeded max level (%r, %s vs %s)" % (self,
-                                                                                         data.max(),
-                                                                                         self.__max_value))
+                                                                                         hi,
+                                                                                         self._max_value))
 
-        if data.min() < self.__min_value:
+        if lo < self._min_value:
             raise ValueError("Audio stimulus value lower than min level (%r, %s vs %s)" % (self,
-                                                                                           data.min(),
-                                                                                           self.__min_value))
+                                                                                           lo,
+                                                                                           self._min_value))
 
     def describe(self):
         return {'name': self.NAME,
-                'sample_rate': self.__sample_rate,
-                'duration': self.__duration,
-                'intensity': self.__intensity,
-                'pre_silence': self.__pre_silence,
-                'post_silence': self.__post_silence,
-                'attenuator': self.__attenuator,
-                'frequency': self.__frequency,
-                'max_value': self.__max_value,
-                'min_value': self.__min_value}
+                'sample_rate': self._sample_rate,
+                'duration': self._duration,
+                'intensity': self._intensity,
+                'pre_silence': self._pre_silence,
+                'post_silence': self._post_silence,
+                'attenuator': self._attenuator,
+                'frequency': self._frequency,
+                'max_value': self._max_value,
+                'min_value': self._min_value}
 
     def data_generator(self) -> Iterator[Optional[SampleChunk]]:
         """
         Return a generator that yields the data member when next is called on it. Simply provides another interface to
         the same data stored in the data member.
         """
+        # hoist the invariants out of the yield loop - the data buffer and producer identity do
+        # not change while a configured stimulus is playing. A fresh SampleChunk is still built
+        # per yield because consumers (e.g. AudioStimPlaylist) stamp metadata onto it.
+        data = self.data
+        num_samples = data.shape[0]
+        identifier = self.identifier
+        instance_n = self.producer_instance_n
+        trigger = self.trigger_next_callback
+
         while True:
-            self.num_samples_generated = self.num_samples_generated + self.data.shape[0]
-            chunk = SampleChunk(data=self.data, producer_identifier=self.identifier,
-                                producer_instance_n=self.producer_instance_n)
-            self.trigger_next_callback(chunk)
+            self.num_samples_generated += num_samples
+            chunk = SampleChunk(data=data, producer_identifier=identifier,
+                                producer_instance_n=instance_n)
+            trigger(chunk)
             yield chunk
 
     @property
@@ -170,7 +307,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
         :return: The sample rate of the audio stimulus in Hz.
         :rtype: int
         """
-        return self.__sample_rate
+        return self._sample_rate
 
     @sample_rate.setter
     def sample_rate(self, sample_rate):
@@ -179,8 +316,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
 
         :param int sample_rate: The sample rate of the audio stimulus in Hz.
         """
-        self.__sample_rate = sample_rate
-        self.data = self._generate_data()
+        self.configure(sample_rate=sample_rate)
 
     @property
     def duration(self):
@@ -190,7 +326,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
         :return: The duration of the audio signal in milliseconds.
         :rtype: int
         """
-        return self.__duration
+        return self._duration
 
     @duration.setter
     def duration(self, duration):
@@ -199,8 +335,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
 
         :param int duration: The duration of the audio signal in milliseconds.
         """
-        self.__duration = duration
-        self.data = self._generate_data()
+        self.configure(duration=duration)
 
     @property
     def intensity(self):
@@ -210,7 +345,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
         :return: A scalar multiplicative factor of the signal.
         :rtype: double
         """
-        return self.__intensity
+        return self._intensity
 
     @intensity.setter
     def intensity(self, intensity):
@@ -219,8 +354,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
 
         :param double intensity: A scalar multiplicative factor of the signal.
         """
-        self.__intensity = intensity
-        self.data = self._generate_data()
+        self.configure(intensity=intensity)
 
     @property
     def pre_silence(self):
@@ -230,7 +364,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
         :return: Get the amount (in milliseconds) of pre-silence added to the audio signal.
         :rtype: int
         """
-        return self.__pre_silence
+        return self._pre_silence
 
     @pre_silence.setter
     def pre_silence(self, pre_silence):
@@ -239,8 +373,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
 
         :param int pre_silence: The amount (in milliseconds) of pre-silence added to the audio signal.
         """
-        self.__pre_silence = pre_silence
-        self.data = self._generate_data()
+        self.configure(pre_silence=pre_silence)
 
     @property
     def post_silence(self):
@@ -249,7 +382,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
 
         :return: The amount (in milliseconds) of post-silence added to the audio signal.
         """
-        return self.__post_silence
+        return self._post_silence
 
     @post_silence.setter
     def post_silence(self, post_silence):
@@ -258,8 +391,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
 
         :param int post_silence: The amount (in milliseconds) of post-silence added to the audio signal.
         """
-        self.__post_silence = post_silence
-        self.data = self._generate_data()
+        self.configure(post_silence=post_silence)
 
     @property
     def attenuator(self):
@@ -269,7 +401,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
         :return: The attenuator object used to attenuate the sin signal.
         :rtype: audio.attenuation.Attenuator
         """
-        return self.__attenuator
+        return self._attenuator
 
     @attenuator.setter
     def attenuator(self, attenuator):
@@ -278,8 +410,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
 
         :param audio.stimuli.Attenuator attenuator: The attenuator object used to attenuate the sin signal.
         """
-        self.__attenuator = attenuator
-        self.data = self._generate_data()
+        self.configure(attenuator=attenuator)
 
     @property
     def frequency(self):
@@ -289,7 +420,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
         :return: The frequency of the sin signal in Hz.
         :rtype: float
         """
-        return self.__frequency
+        return self._frequency
 
     @frequency.setter
     def frequency(self, frequency):
@@ -298,8 +429,7 @@ class AudioStim(SignalProducer, metaclass=abc.ABCMeta):
 
         :param float frequency: The frequency of the sin signal in Hz.
         """
-        self.__frequency = frequency
-        self.data = self._generate_data()
+        self.configure(frequency=frequency)
 
 
 class SinStim(AudioStim):
@@ -311,6 +441,8 @@ class SinStim(AudioStim):
 
     NAME = 'sin'
 
+    __slots__ = ('_amplitude', '_phase')
+
     def __init__(self, frequency, amplitude, phase, sample_rate, duration, intensity=1.0, pre_silence=0,
                  post_silence=0, attenuator=None, next_event_callback=None, identifier=None):
         super(SinStim, self).__init__(sample_rate=sample_rate, duration=duration, intensity=intensity,
@@ -318,15 +450,15 @@ class SinStim(AudioStim):
                                       frequency=frequency, next_event_callback=next_event_callback,
                                       identifier=identifier)
 
-        self.__amplitude = amplitude
-        self.__phase = phase
+        self._amplitude = amplitude
+        self._phase = phase
 
         self.data = self._generate_data()
 
     def describe(self):
         desc = super(SinStim, self).describe()
-        desc['amplitude'] = self.__amplitude
-        desc['phase'] = self.__phase
+        desc['amplitude'] = self._amplitude
+        desc['phase'] = self._phase
         return desc
 
     @property
@@ -337,7 +469,7 @@ class SinStim(AudioStim):
         :return: The amplitude of the sin signal.
         :rtype: float
         """
-        return self.__amplitude
+        return self._amplitude
 
     @amplitude.setter
     def amplitude(self, amplitude):
@@ -346,8 +478,7 @@ class SinStim(AudioStim):
 
         :param float amplitude: Set the amplitude of the sin signal.
         """
-        self.__amplitude = amplitude
-        self.data = self._generate_data()
+        self.configure(amplitude=amplitude)
 
     @property
     def phase(self):
@@ -357,7 +488,7 @@ class SinStim(AudioStim):
         :return: The phase of the sin, in radians.
         :rtype: float
         """
-        return self.__phase
+        return self._phase
 
     @phase.setter
     def phase(self, phase):
@@ -366,8 +497,7 @@ class SinStim(AudioStim):
 
         :param float phase: The phase of the sin, in radians.
         """
-        self.__phase = phase
-        self.data = self._generate_data()
+        self.configure(phase=phase)
 
     def _generate_data(self):
         """
@@ -377,13 +507,7 @@ class SinStim(AudioStim):
         :return: The sin signal data, ready to be passed to the DAQ as voltage signals.
         :rtype: numpy.ndarray
         """
-        # noinspection PyPep8Naming
-        T = np.linspace(0.0, float(self.duration) / 1000.0, int((float(self.sample_rate) / 1000.0) * self.duration))
-
-        # Generate the samples of the sin wave with specified amplitude, frequency, and phase.
-        data = self.amplitude * np.sin(2 * np.pi * self.frequency * T + self.phase)
-
-        return data
+        return _sin_table(self.frequency, self.amplitude, self.phase, self.sample_rate, self.duration)
 
 
 class SquareWaveStim(AudioStim):
@@ -395,6 +519,8 @@ class SquareWaveStim(AudioStim):
 
     NAME = 'square'
 
+    __slots__ = ('_duty_cycle', '_amplitude')
+
     def __init__(self, frequency, duty_cycle, amplitude, sample_rate, duration, intensity=1.0, pre_silence=0,
                  post_silence=0, attenuator=None, next_event_callback=None, identifier=None):
         super(SquareWaveStim, self).__init__(sample_rate=sample_rate, duration=duration, intensity=intensity,
@@ -402,15 +528,15 @@ class SquareWaveStim(AudioStim):
                                              frequency=frequency, next_event_callback=next_event_callback,
                                              identifier=identifier)
 
-        self.__duty_cycle = duty_cycle
-        self.__amplitude = amplitude
+        self._duty_cycle = duty_cycle
+        self._amplitude = amplitude
 
         self.data = self._generate_data()
 
     def describe(self):
         desc = super(SquareWaveStim, self).describe()
-        desc['duty_cycle'] = self.__duty_cycle
-        desc['amplitude'] = self.__amplitude
+        desc['duty_cycle'] = self._duty_cycle
+        desc['amplitude'] = self._amplitude
         return desc
 
     @property
@@ -421,7 +547,7 @@ class SquareWaveStim(AudioStim):
         :return: The amplitude of the sin signal.
         :rtype: float
         """
-        return self.__amplitude
+        return self._amplitude
 
     @amplitude.setter
     def amplitude(self, amplitude):
@@ -430,8 +556,7 @@ class SquareWaveStim(AudioStim):
 
         :param float amplitude: Set the amplitude of the sin signal.
         """
-        self.__amplitude = amplitude
-        self.data = self._generate_data()
+        self.configure(amplitude=amplitude)
 
     @property
     def duty_cycle(self):
@@ -441,7 +566,7 @@ class SquareWaveStim(AudioStim):
         :return: The duty cycle of the signal, between 0 and 1.
         :rtype: float
         """
-        return self.__duty_cycle
+        return self._duty_cycle
 
     @duty_cycle.setter
     def duty_cycle(self, duty_cycle):
@@ -450,8 +575,7 @@ class SquareWaveStim(AudioStim):
 
         :param float duty_cycle: The duty cycle, between 0 and 1.
         """
-        self.__duty_cycle = duty_cycle
-        self.data = self._generate_data()
+        self.configure(duty_cycle=duty_cycle)
 
     def _generate_data(self):
         """
@@ -472,6 +596,8 @@ class ConstantStim(AudioStim):
 
     NAME = 'constant'
 
+    __slots__ = ('_amplitude',)
+
     def __init__(self, sample_rate, duration, amplitude=1.0, pre_silence=0, post_silence=0, attenuator=None,
                  intensity=1.0, next_event_callback=None, identifier=None):
         super(ConstantStim, self).__init__(sample_rate=sample_rate, duration=duration, intensity=intensity,
@@ -495,6 +621,8 @@ class PulseStim(AudioStim):
 
     NAME = 'pulse'
 
+    __slots__ = ('_amplitudes', '_durations')
+
     def __init__(self, sample_rate, duration_a, amplitude_a, duration_b, amplitude_b,
                  pre_silence=0, post_silence=0, intensity=1.0, attenuator=None,
                  next_event_callback=None, identifier=None):
@@ -532,6 +660,8 @@ class MATFileStim(AudioStim):
 
     MATFILE_EXTENSION = '.mat'
 
+    __slots__ = ('_filename',)
+
     def __init__(self, filename, frequency, sample_rate, intensity=1.0, pre_silence=0, post_silence=0, attenuator=None,
                  next_event_callback=None, identifier=None):
         super(MATFileStim, self).__init__(sample_rate=sample_rate, duration=None, intensity=intensity,
@@ -541,16 +671,16 @@ class MATFileStim(AudioStim):
 
         # strip .mat for internal use
         if filename.endswith('.mat'):
-            self.__filename = filename[:-4]
+            self._filename = filename[:-4]
         else:
-            self.__filename = filename
+            self._filename = filename
 
         self.data = self._generate_data()
 
     def describe(self):
         desc = super(MATFileStim, self).describe()
         desc.pop('duration')
-        desc['filename'] = self.__filename
+        desc['filename'] = self._filename
         return desc
 
     @property
@@ -561,7 +691,7 @@ class MATFileStim(AudioStim):
         :return: The filename that stored the audio data.
         :rtype: str
         """
-        return self.__filename
+        return self._filename
 
     @filename.setter
     def filename(self, filename):
@@ -570,24 +700,23 @@ class MATFileStim(AudioStim):
 
         :param str filename: The name of the file that stores the audio stimulus data.
         """
-        self.__filename = filename
-        self.data = self._generate_data()
+        self.configure(filename=filename)
 
     def _generate_data(self):
         """
-        Load the sample data from the file with path stored in __filename.
+        Load the sample data from the file with path stored in _filename.
 
         :return: The audio stimulus data, ready to be passed to the DAQ as voltage signals.
         :rtype: numpy.ndarray
         """
         try:
-            data = scipy.io.loadmat(self.__filename, variable_names=['stim'], squeeze_me=True, appendmat=True)
+            data = scipy.io.loadmat(self._filename, variable_names=['stim'], squeeze_me=True, appendmat=True)
             data = data['stim']
 
             return data
         except NotImplementedError:
             # This exception indicates that this is an HDF5 file and not an old type MAT file
-            h5_file = h5py.File(self.__filename + '.mat', 'r')
+            h5_file = h5py.File(self._filename + '.mat', 'r')
             data = np.squeeze(h5_file['stim'])
 
             return data
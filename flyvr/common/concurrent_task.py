@@ -1,15 +1,123 @@
 import time
 import sys
+import logging
 
 from multiprocessing import Process, Pipe, Manager
 # noinspection PyUnresolvedReferences
 from multiprocessing.dummy import Process as _DummyProcess, Queue as _DummyQueue, Pipe as _DummyPipe
 
+import numpy as np
+
 
 class _DummyProcessDaemonThread(_DummyProcess):
     daemon = True
 
 
+class _ShmemRingSender(object):
+    """
+    Pipe-compatible sender that passes (np.ndarray, timestamp) tuples through a ring of
+    shared-memory slots, so only slot metadata is pickled per send and the sample bytes cross
+    process boundaries exactly once (the consumer copies them straight out of shared memory).
+    Anything that is not such a tuple (e.g. the None shutdown sentinel) falls back to the pipe.
+
+    Each slot carries a sequence header written around the sample bytes (seqlock style: -1
+    while a write is in progress, the message sequence number afterwards) so a consumer that
+    fell more than N_SLOTS messages behind detects the overwritten slot instead of silently
+    returning torn frames.
+    """
+
+    N_SLOTS = 8
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._shm = None
+        self._slot_seq = None
+        self._slot_nbytes = 0
+        self._head = 0
+
+    def send(self, data):
+        if isinstance(data, tuple) and len(data) == 2 and isinstance(data[0], np.ndarray):
+            arr, ts = data
+
+            if self._shm is None:
+                from multiprocessing import shared_memory
+                self._slot_nbytes = arr.nbytes
+                self._shm = shared_memory.SharedMemory(create=True,
+                                                       size=self.N_SLOTS * (self._slot_nbytes + 8))
+                self._slot_seq = np.ndarray((self.N_SLOTS,), dtype=np.int64,
+                                            buffer=self._shm.buf[self.N_SLOTS * self._slot_nbytes:])
+                self._slot_seq[:] = -1
+                self._conn.send(('shm', self._shm.name, self._slot_nbytes, self.N_SLOTS))
+
+            if arr.nbytes == self._slot_nbytes:
+                slot = self._head % self.N_SLOTS
+                dst = np.ndarray(arr.shape, dtype=arr.dtype,
+                                 buffer=self._shm.buf[slot * self._slot_nbytes:(slot + 1) * self._slot_nbytes])
+                self._slot_seq[slot] = -1
+                np.copyto(dst, arr)
+                self._slot_seq[slot] = self._head
+                self._conn.send(('arr', slot, self._head, arr.shape, arr.dtype.str, ts))
+                self._head += 1
+                return
+
+        self._conn.send(('obj', data))
+
+    def close(self):
+        self._conn.close()
+        if self._shm is not None:
+            self._shm.close()
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class _ShmemRingReceiver(object):
+    """ the consumer end of _ShmemRingSender - same poll/recv interface as a pipe """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._shm = None
+        self._slot_seq = None
+        self._slot_nbytes = 0
+        self._log = logging.getLogger('flyvr.common.concurrent_task')
+
+    def poll(self, timeout=None):
+        return self._conn.poll(timeout)
+
+    def recv(self):
+        while True:
+            msg = self._conn.recv()
+            kind = msg[0]
+
+            if kind == 'obj':
+                return msg[1]
+            elif kind == 'shm':
+                from multiprocessing import shared_memory
+                self._shm = shared_memory.SharedMemory(name=msg[1])
+                self._slot_nbytes = msg[2]
+                n_slots = msg[3]
+                self._slot_seq = np.ndarray((n_slots,), dtype=np.int64,
+                                            buffer=self._shm.buf[n_slots * self._slot_nbytes:])
+            else:
+                _, slot, seq, shape, dtype, ts = msg
+                src = np.ndarray(shape, dtype=np.dtype(dtype),
+                                 buffer=self._shm.buf[slot * self._slot_nbytes:(slot + 1) * self._slot_nbytes])
+                # copy out before the producer comes around to this slot again
+                out = src.copy()
+                if self._slot_seq[slot] != seq:
+                    # the sender lapped us and overwrote this slot while (or before) we copied;
+                    # drop the torn frame loudly and move on to the next message
+                    self._log.warning('shmem ring overrun: consumer lagging, dropped stale frame %d' % seq)
+                    continue
+                return out, ts
+
+    def close(self):
+        self._conn.close()
+        if self._shm is not None:
+            self._shm.close()
+
+
 class ConcurrentTask(object):
 
     """
@@ -29,6 +137,9 @@ class ConcurrentTask(object):
             return Pipe()
         elif comms == 'queue':
             return manager_cls().Queue()
+        elif comms == 'shmem':
+            _sender_conn, _receiver_conn = Pipe()
+            return _ShmemRingSender(_sender_conn), _ShmemRingReceiver(_receiver_conn)
         else:
             raise NotImplementedError
 
@@ -43,14 +154,14 @@ class ConcurrentTask(object):
         """
 
         # task (function(pip/queue, getfun, *args)), task init args, queue/pipe
-        if comms == "pipe":
-            self._sender, self._receiver = self.get_comms('pipe', manager_cls=self.manager_cls)
+        if comms in ("pipe", "shmem"):
+            self._sender, self._receiver = self.get_comms(comms, manager_cls=self.manager_cls)
         elif comms == "queue":
             self._receiver = self._sender = self.get_comms('queue', manager_cls=self.manager_cls)
         elif comms is None:
             self._sender = self._receiver = None
         else:
-            raise ValueError("comms argument must either be 'queue' or 'pipe'")
+            raise ValueError("comms argument must either be 'queue', 'pipe' or 'shmem'")
 
         self.comms = comms
 
@@ -75,7 +186,7 @@ class ConcurrentTask(object):
 
         if self.comms == "queue":
             self._sender.put(data)
-        elif self.comms == "pipe":
+        elif self.comms in ("pipe", "shmem"):
             self._sender.send(data)
 
     @property
@@ -80,10 +80,9 @@ def main():
     import time
 
     def tick():
-        print(("{0:.4f}".format(time.clock() * 1000)))
+        print(("{0:.4f}".format(time.perf_counter_ns() / 1e6)))
 
     t1 = MMTimer(40, tick)
-    time.clock()
     t1.start(True)
     time.sleep(20)
     t1.stop()
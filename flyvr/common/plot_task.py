@@ -61,37 +61,41 @@ def plot_task_daq(disp_queue, channel_names, chunk_size, limit, num_chunks_histo
 
     RUN = True
     while RUN:
-        if disp_queue.poll(0.1):
+        # block until data arrives instead of waking at 10Hz to poll. ConcurrentTask.close()
+        # sends a None sentinel (and closes the pipe), so shutdown unblocks us immediately.
+        try:
             msg = disp_queue.recv()
+        except EOFError:
+            break
 
-            if msg is None:
-                continue
+        if msg is None:
+            break
 
-            data = msg[0]
-            time_ns = msg[1]
+        data = msg[0]
+        time_ns = msg[1]
 
-            if data is not None:
+        if data is not None:
 
-                # Append to the history
-                data_history.append(data)
+            # Append to the history
+            data_history.append(data)
 
-                # Turned the queued chunks into a flat array
-                sample_i = 0
-                for d in data_history:
-                    plot_data[sample_i:(sample_i + chunk_size), :] = d
-                    sample_i = sample_i + chunk_size
+            # Turned the queued chunks into a flat array
+            sample_i = 0
+            for d in data_history:
+                plot_data[sample_i:(sample_i + chunk_size), :] = d
+                sample_i = sample_i + chunk_size
 
-                for chn in range(num_channels):
-                    fig.canvas.restore_region(backgrounds[chn])  # restore background
-                    point_sets[chn].set_data(np.arange(num_chunks_history * chunk_size), plot_data[:, chn])
-                    axes[chn].draw_artist(point_sets[chn])  # redraw just the points
-                    # fig.canvas.blit(axes[chn].bbox)                    # fill in the axes rectangle
+            for chn in range(num_channels):
+                fig.canvas.restore_region(backgrounds[chn])  # restore background
+                point_sets[chn].set_data(np.arange(num_chunks_history * chunk_size), plot_data[:, chn])
+                axes[chn].draw_artist(point_sets[chn])  # redraw just the points
+                # fig.canvas.blit(axes[chn].bbox)                    # fill in the axes rectangle
 
-                fig.canvas.draw()
-                fig.canvas.flush_events()
+            fig.canvas.draw()
+            fig.canvas.flush_events()
 
-            else:
-                RUN = False
+        else:
+            RUN = False
 
     # clean up
     plt.close(fig)
@@ -74,7 +74,7 @@ def print_fictrac_state(data):
     state_string = ""
     for field_name, field_type in data._fields_:
         field = getattr(data, field_name)
-        if (isinstance(field, float) | isinstance(field, int)):
+        if isinstance(field, (float, int)):
             state_string = state_string + str(field) + "\t"
         else:
             state_string = state_string + str(field[0]) + "\t" + str(field[1]) + "\t" + str(field[2]) + "\t"
@@ -57,4 +57,40 @@ def test_mat_file_stim_attenuation():
 
     stim.attenuator = att
 
-    assert(stim.data[10] == 4*oldVal)
\ No newline at end of file
+    assert(stim.data[10] == 4*oldVal)
+
+
+def test_get_factor():
+    att = Attenuator(attenuation_factors=dict(list(zip([0, 100, 150, 200, 250],
+                                                       [3.9273, 0.0701, 0.1178, 0.1851, 0.2132]))))
+
+    # no frequency means no attenuation
+    assert att.get_factor(None) == 1.0
+
+    # table lookup, and interpolation off the table agreeing with attenuate()
+    assert att.get_factor(200) == 0.1851
+    assert att.get_factor(220) == 0.19634
+
+    # interpolated factors are memoized per frequency
+    assert 220 in att._factor_cache
+    assert att.get_factor(220) == 0.19634
+
+
+def test_attenuation_matrix_shared_and_refreshed():
+    att = Attenuator(attenuation_factors=dict(list(zip([0, 100, 150, 200, 250], [0, 1, 2, 3, 4]))))
+
+    # built lazily once, read-only, and matching the factor table
+    matrix = att.attenuation_matrix
+    assert att.attenuation_matrix is matrix
+    assert not matrix.flags.writeable
+    assert np.array_equal(matrix[:, 0], att.frequencies)
+    assert np.array_equal(matrix[:, 1], att.factors)
+
+    # stimuli pick up (and share) the matrix when the attenuator is assigned post-construction
+    stim = SinStim(frequency=250, amplitude=2.0, phase=0.0, sample_rate=40000,
+                   duration=200, intensity=1.0, pre_silence=0, post_silence=0,
+                   attenuator=None)
+    assert stim.attenuation is None
+
+    stim.attenuator = att
+    assert stim.attenuation is matrix
@@ -112,3 +112,44 @@ def test_mix_different_sizes():
         chunk = next(gen).data
         assert (np.array_equal(chunk[:, 0], stim1.data))
         assert (np.array_equal(chunk[:, 1], np.ones(shape=stim1.data.shape) * 5))
+
+
+def test_chunker_buffer_recycling():
+    # chunker yields preallocated output buffers in rotation: a yielded chunk's data stays
+    # valid until n_buffers - 1 further chunks have been produced, after which the same
+    # buffer comes around again. Consumers that queue chunks ahead rely on this contract.
+    def simple_gen():
+        x = 0
+        while True:
+            yield SampleChunk(data=np.arange(x, x + 100, dtype=np.float64),
+                              producer_identifier='', producer_instance_n=-1)
+            x = x + 100
+
+    for n_buffers in (2, 4):
+        chunk_gen = chunker(simple_gen(), 100, n_buffers=n_buffers)
+        bufs = [next(chunk_gen).data for _ in range(2 * n_buffers)]
+
+        # one distinct buffer per rotation slot, reused exactly every n_buffers chunks
+        assert len(set(id(b) for b in bufs[:n_buffers])) == n_buffers
+        for i in range(n_buffers, 2 * n_buffers):
+            assert bufs[i] is bufs[i - n_buffers]
+
+
+def test_chunker_copy_as_you_go():
+    # copying each chunk before the buffer rotates back reproduces the stimulus stream exactly
+    stim = SinStim(frequency=230, amplitude=2.0, phase=0.0, sample_rate=40000,
+                   duration=200, intensity=1.0, pre_silence=0, post_silence=0,
+                   attenuator=None)
+
+    expected = np.tile(stim.data, 3)
+    chunk_gen = chunker(stim.data_generator(), 100)
+
+    copied = [next(chunk_gen).data.copy() for _ in range(expected.shape[0] // 100)]
+    assert np.array_equal(np.concatenate(copied), expected)
+
+    # and the chunk yielded before the last one is still intact (valid for n_buffers - 1 = 1
+    # further chunk with the default double buffering)
+    prev = next(chunk_gen)
+    prev_copy = prev.data.copy()
+    next(chunk_gen)
+    assert np.array_equal(prev.data, prev_copy)
@@ -2,6 +2,8 @@ import pytest
 from unittest import mock
 import math
 
+import numpy as np
+
 from flyvr.audio.stimuli import AudioStim, SinStim
 
 
@@ -67,3 +69,31 @@ def test_callbacks(stim):
     next(data_gen)
 
     my_callback_mock.assert_called()
+
+
+def test_configure_batched(stim):
+    # configure() applies several parameters with one regeneration and matches the
+    # equivalent sequence of property assignments
+    other = SinStim(frequency=230, amplitude=2.0, phase=0.0, sample_rate=40000,
+                    duration=200, intensity=1.0, pre_silence=0, post_silence=0,
+                    attenuator=None)
+    other.amplitude = 3
+    other.phase = math.pi
+
+    stim.configure(amplitude=3, phase=math.pi)
+
+    assert np.array_equal(stim.data, other.data)
+    assert abs(stim.data[29] - -2.599057525115452) < 1e-08
+
+
+def test_configure_noop(stim):
+    # assigning a parameter its current value must not rerun the data pipeline
+    before = stim.data
+    stim.intensity = stim.intensity
+    stim.configure(amplitude=stim.amplitude, phase=stim.phase)
+    assert stim.data is before
+
+
+def test_configure_unknown_parameter(stim):
+    with pytest.raises(AttributeError):
+        stim.configure(ampltiude=3)